@@ -1,10 +1,11 @@
 import asyncio
 import aiohttp
-from typing import Dict, List, Optional
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
-import json
+from tenacity import retry, stop_after_attempt, wait_random_exponential
+import orjson
 import os
 import random
 from datetime import timezone, timedelta
@@ -22,24 +23,45 @@ logger = structlog.get_logger()
 
 HL_WS_URL = 'wss://api.hyperliquid.xyz/ws'
 HL_HTTP_INFO = 'https://api.hyperliquid.xyz/info'
+# Window during which concurrent/back-to-back HTTP allMids callers share one request
+HL_HTTP_MIDS_TTL = 0.25
+
+_WS_DATA_TYPES = (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY)
+_WS_END_TYPES = (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR)
 
 class MarketDataFetcher:
     """Resilient market data fetcher. Primary via Hyperliquid WS, fallback via HTTP.
     """
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        # A caller-provided session is shared (pooled connections, DNS cache) and not closed here
+        self.session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
         self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
         self.last_prices: Dict[str, float] = {}
         self.last_price_ts: Dict[str, datetime] = {}
+        self._symbol_cache: Dict[str, str] = {}
         self.last_update: Optional[datetime] = None
         self._ws_task: Optional[asyncio.Task] = None
+        self._mids_http_future: Optional[asyncio.Future] = None
+        self._mids_http_at: float = 0.0
+        # In-flight fetch_all_prices calls keyed by symbol tuple; concurrent callers share one
+        self._inflight: Dict[Tuple[str, ...], asyncio.Future] = {}
         # Alchemy feed (optional)
         self._alchemy: Optional[AlchemyFeed] = None if AlchemyFeed is not None else None
         self._providers: List[str] = self._load_providers()
         self._alchemy_max_age = int(os.getenv('ALCHEMY_MAX_AGE_SEC', '2'))
+        # WS reconnect backoff (decorrelated jitter), seconds
+        self._reconnect_min = float(os.getenv('RECONNECT_MIN', '1'))
+        self._reconnect_max = float(os.getenv('RECONNECT_MAX', '30'))
+        self._reconnect_mult = float(os.getenv('RECONNECT_MULT', '3'))
+        # Synthetic price jitter (dev fallback when live mids are unavailable)
+        self._synth_enabled: bool = os.getenv('ENABLE_SYNTHETIC_PRICES', '1').lower() not in ('0', 'false', 'no')
+        self._synth_vol: float = float(os.getenv('SYNTHETIC_VOLATILITY', '0.002'))
+        self._rng = np.random.default_rng()
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
         # Connect WS and subscribe to all mids for continuous mid price updates
         try:
             self.ws = await self.session.ws_connect(HL_WS_URL, heartbeat=30)
@@ -76,27 +98,28 @@ class MarketDataFetcher:
                 await self._alchemy.stop()
             except Exception:
                 pass
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
 
     async def _ws_subscribe_all_mids(self):
         if not self.ws:
             return
         sub = {"method": "subscribe", "subscription": {"type": "allMids"}}
-        await self.ws.send_str(json.dumps(sub))
+        await self.ws.send_str(orjson.dumps(sub).decode())
 
     async def _ws_unsubscribe_all_mids(self):
         if not self.ws:
             return
         unsub = {"method": "unsubscribe", "subscription": {"type": "allMids"}}
-        await self.ws.send_str(json.dumps(unsub))
+        await self.ws.send_str(orjson.dumps(unsub).decode())
 
     async def _ws_reader(self):
         """Read WS messages and update local cache of mids/prices.
         Expects messages like { channel: 'allMids', data: { mids: { 'BTC': '65000.1', ... } } }
-        Maintains the connection with exponential backoff on failures.
+        Maintains the connection with decorrelated-jitter backoff on failures;
+        the backoff resets once a frame is received successfully.
         """
-        backoff = 1
+        backoff = self._reconnect_min
         while True:
             try:
                 if self.ws is None or self.ws.closed:
@@ -105,29 +128,28 @@ class MarketDataFetcher:
                     logger.info("WS connected (reader loop)")
 
                 async for msg in self.ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
+                    if msg.type in _WS_DATA_TYPES:
+                        # orjson takes TEXT (str) and BINARY (bytes) payloads as-is; no re-encode
                         try:
-                            payload = json.loads(msg.data)
+                            payload = orjson.loads(msg.data)
                         except Exception:
                             continue
+                        backoff = self._reconnect_min
 
-                        channel = payload.get('channel')
-                        data = payload.get('data')
-                        if channel == 'subscriptionResponse':
-                            # ack; ignore
-                            continue
-                        if channel == 'allMids' and isinstance(data, dict):
-                            mids = data.get('mids') or {}
-                            updates = self._apply_all_mids(mids)
+                        # subscriptionResponse acks and other channels are ignored
+                        if type(payload) is dict and payload.get('channel') == 'allMids':
+                            data = payload.get('data')
+                            if not isinstance(data, dict):
+                                continue
+                            updates = self._apply_all_mids(data.get('mids') or {})
                             if updates:
-                                self.last_update = datetime.now(timezone.utc)
                                 logger.debug("WS mids updated", count=updates)
-                    elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    elif msg.type in _WS_END_TYPES:
                         raise ConnectionError("WS closed or errored")
 
                 # If we exit the async for without error, sleep and retry
+                backoff = self._next_backoff(backoff)
                 await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)
             except asyncio.CancelledError:
                 raise
             except Exception as e:
@@ -138,62 +160,130 @@ class MarketDataFetcher:
                 except Exception:
                     pass
                 self.ws = None
+                backoff = self._next_backoff(backoff)
                 await asyncio.sleep(backoff)
-                backoff = min(backoff * 2, 30)
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
+    def _next_backoff(self, prev: float) -> float:
+        # AWS-style decorrelated jitter: spreads reconnects of many clients apart
+        return min(self._reconnect_max, random.uniform(self._reconnect_min, prev * self._reconnect_mult))
+
+    @retry(stop=stop_after_attempt(3), wait=wait_random_exponential(min=1, max=10))
+    async def _fetch_all_mids_http(self) -> Dict[str, float]:
+        """POST a single allMids request and return {coin: mid} for every listed coin."""
+        async with self.session.post(HL_HTTP_INFO, json={"type": "allMids"}) as response:
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status}")
+            data = orjson.loads(await response.read())
+        mids = data if isinstance(data, dict) else {}
+        out: Dict[str, float] = {}
+        for coin, px in mids.items():
+            try:
+                out[coin] = float(px)
+            except Exception:
+                continue
+        return out
+
+    async def _get_all_mids_http(self) -> Dict[str, float]:
+        """Return HTTP allMids, coalescing callers onto an in-flight or very recent request."""
+        loop = asyncio.get_running_loop()
+        fut = self._mids_http_future
+        if fut is not None:
+            if not fut.done():
+                return await asyncio.shield(fut)
+            fresh = loop.time() - self._mids_http_at <= HL_HTTP_MIDS_TTL
+            if fresh and not fut.cancelled() and fut.exception() is None:
+                return fut.result()
+        fut = asyncio.ensure_future(self._fetch_all_mids_http())
+        self._mids_http_future = fut
+        # Registered before any waiter's callback, so the stamp is set by the time they resume
+        fut.add_done_callback(self._mids_http_done)
+        return await asyncio.shield(fut)
+
+    def _mids_http_done(self, fut: asyncio.Future):
+        # The reuse window starts when the response lands, not when the request was sent
+        if self._mids_http_future is fut:
+            self._mids_http_at = fut.get_loop().time()
+        if not fut.cancelled():
+            fut.exception()
+
+    def _http_price_row(self, symbol: str, mid: Optional[float], now: Optional[datetime] = None,
+                        stamps: Optional[Dict[datetime, Tuple[str, int]]] = None,
+                        noise: Optional[float] = None) -> Dict:
+        """Build a price row for symbol from an HTTP allMids value (None if not listed).
+        Batch callers pass one `now`, a shared `stamps` memo (see _stamp) and, for unlisted
+        symbols, `noise` from one batched normal draw; otherwise a scalar is drawn here."""
+        price = mid if mid is not None else 0.0
+        # allMids only gives mid; synthesize bid/ask and leave volume/funding unknown
+        bid = price
+        ask = price
+        volume = 0.0
+        funding_rate = 0.0
+
+        if price == 0:
+            # Fallback synthetic price jitter to keep pipeline alive in dev
+            if self._synth_enabled:
+                if noise is None:
+                    noise = float(self._rng.normal(0.0, self._synth_vol))
+                prev = float(self.last_prices.get(symbol, 100.0))
+                price = max(0.1, prev * (1 + noise))
+                bid = price
+                ask = price
+            else:
+                price = 100.0
+
+        if now is None:
+            now = datetime.now(timezone.utc)
+        ts_iso, ts_ms = self._stamp(now, stamps if stamps is not None else {})
+        self.last_prices[symbol] = price
+        # Record timestamps for HTTP fallback freshness
+        self.last_price_ts[symbol] = now
+        self.last_update = now
+
+        return {
+            'symbol': symbol,
+            'price': price,
+            'bid': bid,
+            'ask': ask,
+            'volume': volume,
+            'funding_rate': funding_rate,
+            'timestamp': ts_iso,
+            '_ts_ms': ts_ms,
+            'source': 'hyperliquid_http'
+        }
+
     async def fetch_price(self, symbol: str) -> Dict:
         """Fetch single price via HTTP as fallback. Returns dict."""
         coin = symbol.replace('-USD-PERP', '')
         # Per docs: use allMids to retrieve mids mapping and pick our coin
-        payload = {"type": "allMids"}
-        async with self.session.post(HL_HTTP_INFO, json=payload) as response:
-            if response.status != 200:
-                raise RuntimeError(f"HTTP {response.status}")
-            data = await response.json()
-            mids = data if isinstance(data, dict) else {}
-            px_str = mids.get(coin)
-            price = float(px_str) if px_str is not None else 0.0
-            # allMids only gives mid; synthesize bid/ask and leave volume/funding unknown
-            bid = price
-            ask = price
-            volume = 0.0
-            funding_rate = 0.0
-
-            if price == 0:
-                # Fallback synthetic price jitter to keep pipeline alive in dev
-                enable_synth = os.getenv('ENABLE_SYNTHETIC_PRICES', '1').lower() not in ('0', 'false', 'no')
-                if enable_synth:
-                    prev = float(self.last_prices.get(symbol, 100.0))
-                    vol = float(os.getenv('SYNTHETIC_VOLATILITY', '0.002'))
-                    price = max(0.1, prev * (1 + random.gauss(0.0, vol)))
-                    bid = price
-                    ask = price
-                else:
-                    price = 100.0
-
-            self.last_prices[symbol] = price
-            # Record timestamps for HTTP fallback freshness
-            self.last_price_ts[symbol] = datetime.now(timezone.utc)
-            self.last_update = datetime.now(timezone.utc)
-
-            return {
-                'symbol': symbol,
-                'price': price,
-                'bid': bid,
-                'ask': ask,
-                'volume': volume,
-                'funding_rate': funding_rate,
-                'timestamp': datetime.now(timezone.utc).isoformat(),
-                'source': 'hyperliquid_http'
-            }
+        mids = await self._get_all_mids_http()
+        return self._http_price_row(symbol, mids.get(coin))
 
     async def fetch_all_prices(self, symbols: List[str]) -> List[Dict]:
+        # Concurrent callers for the same symbols share one fetch. It runs as its own
+        # task and every caller awaits it shielded, so cancelling one caller (even the
+        # one that started it) neither aborts the fetch nor cancels the others.
+        key = tuple(symbols)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_all_prices(symbols))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, key=key: self._inflight_done(key, t))
+        return await asyncio.shield(task)
+
+    def _inflight_done(self, key: Tuple[str, ...], task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure nobody awaited does not log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_all_prices(self, symbols: List[str]) -> List[Dict]:
         out: List[Dict] = []
         missing: List[str] = []
 
         # Prefer Alchemy quotes when fresh
         now = datetime.now(timezone.utc)
+        stamps: Dict[datetime, Tuple[str, int]] = {}
         for s in symbols:
             used = False
             if self._alchemy is not None and 'alchemy' in self._providers:
@@ -202,6 +292,7 @@ class MarketDataFetcher:
                     if q is not None:
                         age = (now - q.ts).total_seconds()
                         if age <= self._alchemy_max_age:
+                            ts_iso, ts_ms = self._stamp(q.ts, stamps)
                             out.append({
                                 'symbol': s,
                                 'price': float(q.price),
@@ -209,7 +300,8 @@ class MarketDataFetcher:
                                 'ask': float(q.price),
                                 'volume': 0.0,
                                 'funding_rate': 0.0,
-                                'timestamp': q.ts.isoformat(),
+                                'timestamp': ts_iso,
+                                '_ts_ms': ts_ms,
                                 'source': 'alchemy_wss'
                             })
                             used = True
@@ -220,6 +312,8 @@ class MarketDataFetcher:
 
         # Prefer HL WS cache next if available
         selected_symbols = {row['symbol'] for row in out}
+        cached_syms: List[str] = []
+        cached_px: List[float] = []
         for s in symbols:
             if s in selected_symbols:
                 continue
@@ -227,39 +321,60 @@ class MarketDataFetcher:
             if px is None:
                 missing.append(s)
                 continue
-            price_val = float(px)
-            # If WS not connected, optionally jitter cached prices to simulate live movement
-            if (self.ws is None or self.ws.closed):
-                enable_synth = os.getenv('ENABLE_SYNTHETIC_PRICES', '1').lower() not in ('0', 'false', 'no')
-                if enable_synth:
-                    vol = float(os.getenv('SYNTHETIC_VOLATILITY', '0.002'))
-                    price_val = max(0.1, price_val * (1 + random.gauss(0.0, vol)))
-                    self.last_prices[s] = price_val
+            cached_syms.append(s)
+            cached_px.append(float(px))
+        ws_live = bool(self.ws and not self.ws.closed)
+        # If WS not connected, optionally jitter cached prices to simulate live movement
+        if cached_syms and not ws_live and self._synth_enabled:
+            noise = self._rng.normal(0.0, self._synth_vol, size=len(cached_px))
+            cached_px = np.maximum(0.1, np.asarray(cached_px) * (1 + noise)).tolist()
+            self.last_prices.update(zip(cached_syms, cached_px))
+        source = 'hyperliquid_ws' if ws_live else 'synthetic'
+        for s, price_val in zip(cached_syms, cached_px):
             # Use per-symbol HL timestamp if available
-            ts_dt = self.last_price_ts.get(s) or datetime.now(timezone.utc)
+            ts_iso, ts_ms = self._stamp(self.last_price_ts.get(s) or now, stamps)
             out.append({
                 'symbol': s,
-                'price': float(price_val),
-                'bid': float(price_val),
-                'ask': float(price_val),
+                'price': price_val,
+                'bid': price_val,
+                'ask': price_val,
                 'volume': 0.0,
                 'funding_rate': 0.0,
-                'timestamp': ts_dt.isoformat(),
-                'source': 'hyperliquid_ws' if self.ws and not self.ws.closed else 'synthetic'
+                'timestamp': ts_iso,
+                '_ts_ms': ts_ms,
+                'source': source
             })
 
         # Fallback to HTTP for any missing symbols
+        # (allMids returns every coin, so one request covers all of them)
         if missing:
-            tasks = [self.fetch_price(s) for s in missing]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for r in results:
-                if isinstance(r, dict):
-                    out.append(r)
-                else:
-                    logger.error(f"Price fetch failed: {r}")
+            try:
+                mids = await self._get_all_mids_http()
+            except Exception as e:
+                logger.error(f"Price fetch failed: {e}")
+            else:
+                # One stamp for every row of this response, taken after the request returned
+                http_now = datetime.now(timezone.utc)
+                listed = [mids.get(s.replace('-USD-PERP', '')) for s in missing]
+                # Jitter for unlisted symbols in one batch, as for cached prices above
+                unlisted = sum(1 for mid in listed if not mid)
+                jitter = iter(())
+                if unlisted and self._synth_enabled:
+                    jitter = iter(self._rng.normal(0.0, self._synth_vol, size=unlisted).tolist())
+                for s, mid in zip(missing, listed):
+                    out.append(self._http_price_row(s, mid, http_now, stamps, None if mid else next(jitter, None)))
 
         return out
 
+    @staticmethod
+    def _stamp(ts_dt: datetime, memo: Dict[datetime, Tuple[str, int]]) -> Tuple[str, int]:
+        """(ISO string, epoch ms) for ts_dt. Mids from one WS frame share a datetime,
+        so memo turns per-row isoformat/timestamp calls into one per distinct time."""
+        stamp = memo.get(ts_dt)
+        if stamp is None:
+            stamp = memo[ts_dt] = (ts_dt.isoformat(), int(ts_dt.timestamp() * 1000))
+        return stamp
+
     @staticmethod
     def _normalize_symbol(coin: str) -> str:
         # Map Hyperliquid coin code to our symbol format used elsewhere
@@ -269,17 +384,24 @@ class MarketDataFetcher:
         """Apply an allMids payload to the local cache. Returns number of updates.
         Example mids: { 'BTC': '65000.1', 'ETH': '3200.5' }
         """
-        updates = 0
+        symbol_cache = self._symbol_cache
+        new_prices: Dict[str, float] = {}
         for coin, px in mids.items():
             try:
                 price = float(px)
             except Exception:
                 continue
-            symbol = self._normalize_symbol(coin)
-            self.last_prices[symbol] = price
-            self.last_price_ts[symbol] = datetime.now(timezone.utc)
-            updates += 1
-        return updates
+            symbol = symbol_cache.get(coin)
+            if symbol is None:
+                symbol = symbol_cache.setdefault(coin, self._normalize_symbol(coin))
+            new_prices[symbol] = price
+        if new_prices:
+            # One timestamp per frame; every mid in it arrived together
+            now = datetime.now(timezone.utc)
+            self.last_update = now
+            self.last_prices.update(new_prices)
+            self.last_price_ts.update(dict.fromkeys(new_prices, now))
+        return len(new_prices)
 
     @staticmethod
     def _load_providers() -> List[str]:
@@ -1,9 +1,12 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, StreamingResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
-import json
+import orjson
 import asyncio
+import aiohttp
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 import structlog
@@ -49,10 +52,20 @@ quant_provider = DeepseekQuant() if provider_name == 'deepseek' else LocalQuant(
 signal_engine = SignalEngine(settings, quant_provider=quant_provider)
 cache = RedisCache(settings.redis_url)
 connected_websockets: List[WebSocket] = []
-last_price_update: datetime | None = None
+last_price_update: float | None = None  # time.monotonic() of the last price write
 provider_status: Dict[str, Any] = {"alchemyActive": False, "hlWsConnected": False}
-sse_subscribers: List[asyncio.Queue[str]] = []
+sse_subscribers: List[asyncio.Queue[bytes]] = []
+# Monotonic time each SSE subscriber last pulled from its queue; idle ones are dropped
+sse_last_activity: Dict[asyncio.Queue, float] = {}
+SSE_IDLE_TIMEOUT_SEC = 60.0
 debouncer = None  # set on startup
+# Pre-encoded initial_signal frame for new websocket clients, refreshed by compute_best;
+# served only while younger than settings.cache_ttl, like the cached best_signal
+_last_initial_frame: str = ''
+_last_initial_frame_at: float = 0.0  # time.monotonic()
+# Pair search is synchronous CPU work; run it off the event loop so WS reads and
+# broadcasts keep flowing. A single worker keeps computations ordered.
+_compute_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signal-compute")
 
 # Mount frontend
 app.mount("/static", StaticFiles(directory="frontend"), name="static")
@@ -64,6 +77,10 @@ async def startup_event():
         await init_db()
     except Exception as e:
         logger.warning("DB init failed; continuing without DB", error=str(e))
+    # One pooled HTTP/WS session shared by every fetcher for the app's lifetime
+    app.state.session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+    )
     logger.info("Starting background tasks")
     # Initialize debouncer for event-driven compute
     if settings.event_driven_compute:
@@ -95,16 +112,19 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     await cache.close()
+    if getattr(app.state, 'session', None) is not None:
+        await app.state.session.close()
+    _compute_pool.shutdown(wait=False, cancel_futures=True)
 
 async def market_data_loop():
     global last_price_update
-    async with MarketDataFetcher() as fetcher:
+    async with MarketDataFetcher(session=app.state.session) as fetcher:
         while True:
             try:
                 prices = await fetcher.fetch_all_prices(settings.symbols)
                 signal_engine.update_prices(prices)
                 await cache.set("latest_prices", prices, ttl=settings.cache_ttl)
-                last_price_update = datetime.now()
+                last_price_update = time.monotonic()
                 # Update provider status from fetcher state and latest batch sources
                 try:
                     hl_ok = bool(getattr(fetcher, 'ws', None) and not getattr(fetcher.ws, 'closed', True))
@@ -123,6 +143,16 @@ async def market_data_loop():
                 logger.error(f"Market data loop error: {e}")
             await asyncio.sleep(settings.update_interval)
 
+def row_age_ms(row: Dict[str, Any], now_ms: int) -> int:
+    # Fetcher rows carry epoch ms in `_ts_ms`, so ages are integer subtraction
+    ts_ms = row.get('_ts_ms')
+    if ts_ms is None:
+        # Rows cached before stamping was introduced
+        ts = row.get('timestamp')
+        tdt = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
+        ts_ms = int(tdt.timestamp() * 1000)
+    return now_ms - ts_ms
+
 async def signal_generation_loop():
     await asyncio.sleep(5)
     while True:
@@ -132,8 +162,15 @@ async def signal_generation_loop():
             logger.error(f"Signal generation error: {e}")
         await asyncio.sleep(settings.update_interval)
 
+async def find_pairs():
+    # Snapshot on the loop, where update_prices appends; the worker only does the math
+    snapshot = signal_engine.price_matrix()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_compute_pool, signal_engine.find_cointegrated_pairs, snapshot)
+
 async def compute_best():
-    signals = signal_engine.find_cointegrated_pairs()
+    global _last_initial_frame, _last_initial_frame_at
+    signals = await find_pairs()
     if signals:
         best = signals[0]
         # Save to DB if available; don't block caching/broadcast on DB failures in local dev
@@ -141,25 +178,49 @@ async def compute_best():
             await save_signal(best)
         except Exception as e:
             logger.warning("save_signal_failed; continuing", error=str(e))
-        payload = SignalResponse.from_signal(best).model_dump()
+        # Dump and serialize once; the cache, WS and SSE fan-out all share it
+        payload = SignalResponse.from_signal(best).model_dump(mode='json')
+        payload_json = orjson.dumps(payload)
         await cache.set("best_signal", payload, ttl=settings.cache_ttl)
-        await broadcast_signal(best)
-        await broadcast_sse(payload)
+        _last_initial_frame = (b'{"type":"initial_signal","data":' + payload_json + b'}').decode()
+        _last_initial_frame_at = time.monotonic()
+        await broadcast_signal(b'{"type":"signal_update","data":' + payload_json + b'}')
+        await broadcast_sse(b"data: " + payload_json + b"\n\n")
         logger.info(f"Best signal: {best.pair} z={best.z_score:.2f}")
 
-async def broadcast_signal(signal):
-    message = json.dumps({
-        'type': 'signal_update',
-        'data': SignalResponse.from_signal(signal).model_dump()
-    }, default=str)
-    for ws in list(connected_websockets):
+WS_SEND_TIMEOUT_SEC = 1.0
+
+async def _send_one(ws: WebSocket, message: str):
+    try:
+        await asyncio.wait_for(ws.send_text(message), WS_SEND_TIMEOUT_SEC)
+        return ws, True
+    except Exception:
+        return ws, False
+
+async def _close_one(ws: WebSocket):
+    try:
+        await asyncio.wait_for(ws.close(code=1013), WS_SEND_TIMEOUT_SEC)
+    except Exception:
+        pass
+
+async def broadcast_signal(frame: bytes):
+    # Fan the prebuilt frame out to every client concurrently; a client that cannot
+    # take it within WS_SEND_TIMEOUT_SEC is dropped rather than stalling the rest.
+    # Frames stay text so browser clients can JSON.parse(event.data) directly.
+    message = frame.decode()
+    targets = list(connected_websockets)
+    if not targets:
+        return
+    results = await asyncio.gather(*(_send_one(ws, message) for ws in targets), return_exceptions=True)
+    failed = [ws for ws, res in zip(targets, results) if isinstance(res, BaseException) or not res[1]]
+    for ws in failed:
         try:
-            await ws.send_text(message)
-        except Exception:
-            try:
-                connected_websockets.remove(ws)
-            except ValueError:
-                pass
+            connected_websockets.remove(ws)
+        except ValueError:
+            pass
+    if failed:
+        # A timed-out send may have been cancelled mid-frame; close so the client reconnects
+        await asyncio.gather(*(_close_one(ws) for ws in failed), return_exceptions=True)
 
 @app.get("/")
 async def root():
@@ -189,7 +250,7 @@ async def get_system_status():
     freshness = None
     if last_price_update is not None:
         try:
-            freshness = int((datetime.now() - last_price_update).total_seconds())
+            freshness = int(time.monotonic() - last_price_update)
         except Exception:
             freshness = None
     return SystemStatus(
@@ -201,20 +262,18 @@ async def get_system_status():
     )
 
 @app.get("/healthz")
-async def healthz():
+async def healthz(response: Response):
     # Summarize latest price age and sources per symbol
     latest = await cache.get("latest_prices") or []
-    now = datetime.now(timezone.utc)
+    now_ms = time.time_ns() // 1_000_000
     symbols: Dict[str, Dict[str, Any]] = {}
     for row in latest:
         try:
-            sym = row.get('symbol')
-            ts = row.get('timestamp')
-            tdt = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
-            age_ms = int((now - tdt).total_seconds() * 1000)
-            symbols[sym] = {"source": row.get('source'), "ageMs": age_ms}
+            symbols[row.get('symbol')] = {"source": row.get('source'), "ageMs": row_age_ms(row, now_ms)}
         except Exception:
             continue
+    # Let polling dashboards share a response for a second
+    response.headers["Cache-Control"] = "max-age=1"
     return {
         "ok": True,
         "lastPriceWriteIso": datetime.now(timezone.utc).isoformat(),
@@ -229,63 +288,56 @@ async def get_top_hedge_best(windows: str = "24h,6h,1h"):
     Sides are derived from window z-score using the engine's determine logic.
     """
     from itertools import combinations
-    import pandas as pd
 
     req_windows = [w.strip() for w in windows.split(",") if w.strip()]
     window_points = {"1h": 20, "6h": 50, "24h": 200}
 
-    symbols = list(signal_engine.price_history.keys())
+    # Ring buffer views for symbols with enough history; pairs are built once for all windows
+    rings = {s: ring for s, ring in signal_engine.price_history.items() if len(ring) >= 5}
+    arrays = {s: ring.tail() for s, ring in rings.items()}
+    pairs = list(combinations(arrays, 2))
     out_windows = []
     now_iso = datetime.now().isoformat()
 
     for w in req_windows:
         n = window_points.get(w, 20)
-        best = None
-        best_score = -1.0
-        best_row = None
-        for a, b in combinations(symbols, 2):
-            p1_full = [p['price'] for p in signal_engine.price_history.get(a, [])]
-            p2_full = [p['price'] for p in signal_engine.price_history.get(b, [])]
-            if len(p1_full) < 5 or len(p2_full) < 5:
-                continue
-            p1 = pd.Series(p1_full[-n:])
-            p2 = pd.Series(p2_full[-n:])
+        # Rank by absolute divergence between legs' pct change over the window
+        candidates = []
+        for a, b in pairs:
+            # Align both legs on their most recent common samples
+            m = min(n, arrays[a].size, arrays[b].size)
+            p1 = arrays[a][-m:]
+            p2 = arrays[b][-m:]
+            pa = float((p1[-1] - p1[0]) / max(abs(p1[0]), 1e-9))
+            pb = float((p2[-1] - p2[0]) / max(abs(p2[0]), 1e-9))
+            candidates.append((abs(pb - pa), a, b, m, p1, p2, pa, pb))
+        # Only the winner needs a hedge fit for its sides; fall through on fit failures
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for _, a, b, m, p1, p2, pa, pb in candidates:
             try:
-                hedge = signal_engine.quant.calculate_hedge_ratio(p1, p2)
+                hedge = signal_engine.quant.calculate_hedge_ratio(p1, p2, rings[a].tail_log(m), rings[b].tail_log(m))
                 spread = p2 - hedge * p1
             except Exception:
                 continue
             # z-score on window
             mean = float(spread.mean())
-            std = float(spread.std() or 1e-9)
-            z = float((float(spread.iloc[-1]) - mean) / std)
+            std = float(spread.std(ddof=1) or 1e-9)
+            z = float((float(spread[-1]) - mean) / std)
             side_type = signal_engine._determine_signal(z)
-            # per-leg pct change over window
-            def pct(series):
-                base = float(series.iloc[0])
-                last = float(series.iloc[-1])
-                return (last - base) / max(abs(base), 1e-9)
-            pa = float(pct(p1))
-            pb = float(pct(p2))
-            # ranking by absolute divergence between legs
-            score = abs(pb - pa)
-            if score > best_score:
-                best_score = score
-                best_row = {
-                    "window": w,
-                    "pair": {"a": a, "b": b},
-                    "sides": ( {"a": "LONG", "b": "SHORT"} if side_type == "SHORT_SPREAD" else {"a": "SHORT", "b": "LONG"} ),
-                    "pctChange": {"a": pa, "b": pb},
-                }
-        if best_row:
-            out_windows.append(best_row)
+            out_windows.append({
+                "window": w,
+                "pair": {"a": a, "b": b},
+                "sides": ( {"a": "LONG", "b": "SHORT"} if side_type == "SHORT_SPREAD" else {"a": "SHORT", "b": "LONG"} ),
+                "pctChange": {"a": pa, "b": pb},
+            })
+            break
 
     return {"asOf": now_iso, "windows": out_windows}
 
 @app.get("/api/signals/best-long-short")
 async def get_best_long_short():
     """Expose the current best long/short pair with metrics and simple price charts for both legs."""
-    import pandas as pd
+    import numpy as np
 
     # Try cached best signal first
     cached = await cache.get("best_signal")
@@ -298,7 +350,7 @@ async def get_best_long_short():
             sig = None
     if not sig:
         # Fallback to compute fresh
-        signals = signal_engine.find_cointegrated_pairs()
+        signals = await find_pairs()
         if not signals:
             raise HTTPException(status_code=404, detail="No signals available")
         best = signals[0]
@@ -312,44 +364,48 @@ async def get_best_long_short():
 
     # Prepare charts from price history
     def to_chart(sym: str):
-        series = signal_engine.price_history.get(sym, [])
-        out = []
-        for row in series[-200:]:
-            t = row.get('timestamp')
-            # Ensure ISO string
-            ts = t if isinstance(t, str) else (t.isoformat() if hasattr(t, 'isoformat') else str(t))
-            out.append({"t": ts, "p": float(row.get('price', 0.0))})
-        return out
+        ring = signal_engine.price_history.get(sym)
+        if ring is None:
+            return []
+        return [
+            {"t": datetime.fromtimestamp(t / 1000, tz=timezone.utc).isoformat(), "p": p}
+            for t, p in zip(ring.tail_ts(200).tolist(), ring.tail(200).tolist())
+        ]
 
     charts = {"a": to_chart(a), "b": to_chart(b)}
 
     # Compute simple spread-based pct changes (24h,6h,1h)
-    p1 = pd.Series([p['price'] for p in signal_engine.price_history.get(a, [])])
-    p2 = pd.Series([p['price'] for p in signal_engine.price_history.get(b, [])])
+    empty = np.empty(0, dtype=np.float64)
+    p1 = signal_engine.price_history[a].tail() if a in signal_engine.price_history else empty
+    p2 = signal_engine.price_history[b].tail() if b in signal_engine.price_history else empty
     pct24 = pct6 = pct1 = 0.0
-    if len(p1) >= 5 and len(p2) >= 5:
-        hedge = signal_engine.quant.calculate_hedge_ratio(p1, p2)
-        spread = p2 - hedge * p1
-        def pct_over(n):
-            idx = max(0, len(spread) - n)
-            base = float(spread.iloc[idx])
-            last = float(spread.iloc[-1])
-            return (last - base) / max(abs(base), 1e-9)
-        pct24 = float(pct_over(200))
-        pct6 = float(pct_over(50))
-        pct1 = float(pct_over(20))
+    if p1.size >= 5 and p2.size >= 5:
+        m = min(p1.size, p2.size)
+        p1 = p1[-m:]
+        p2 = p2[-m:]
+        # The signal already carries the hedge fitted on this history
+        hedge = sig.get("hedge_ratio")
+        if hedge is None:
+            hedge = signal_engine.quant.calculate_hedge_ratio(
+                p1, p2,
+                signal_engine.price_history[a].tail_log(m),
+                signal_engine.price_history[b].tail_log(m),
+            )
+        spread = p2 - float(hedge) * p1
+        last = spread[-1]
+        bases = spread[[max(0, m - 200), max(0, m - 50), max(0, m - 20)]]
+        pct24, pct6, pct1 = ((last - bases) / np.maximum(np.abs(bases), 1e-9)).tolist()
 
     # Collect quote meta per leg
     prices = await cache.get("latest_prices") or []
     meta_map = {row['symbol']: row for row in prices if isinstance(row, dict) and 'symbol' in row}
+    now_ms = time.time_ns() // 1_000_000
     def leg_meta(sym: str):
         row = meta_map.get(sym)
         if not row:
             return {"source": None, "ageMs": None}
         try:
-            ts = row.get('timestamp')
-            tdt = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
-            age = int((datetime.now(timezone.utc) - tdt).total_seconds() * 1000)
+            age = row_age_ms(row, now_ms)
         except Exception:
             age = None
         return {"source": row.get('source'), "ageMs": age}
@@ -377,9 +433,14 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     connected_websockets.append(websocket)
     try:
-        data = await cache.get("best_signal")
-        if data:
-            await websocket.send_json({'type': 'initial_signal', 'data': data})
+        if _last_initial_frame and time.monotonic() - _last_initial_frame_at <= settings.cache_ttl:
+            await websocket.send_text(_last_initial_frame)
+        else:
+            # Nothing fresh computed in this process; the cache holds best_signal
+            # for cache_ttl, possibly from a previous run
+            data = await cache.get("best_signal")
+            if data:
+                await websocket.send_text(orjson.dumps({'type': 'initial_signal', 'data': data}, default=str).decode())
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
@@ -390,18 +451,32 @@ async def websocket_endpoint(websocket: WebSocket):
         except ValueError:
             pass
 
-async def broadcast_sse(payload: Dict[str, Any]):
+def _drop_sse_subscriber(q: asyncio.Queue):
+    try:
+        sse_subscribers.remove(q)
+    except ValueError:
+        pass
+    sse_last_activity.pop(q, None)
+
+async def broadcast_sse(frame: bytes):
     if not sse_subscribers:
         return
-    msg = f"data: {json.dumps(payload)}\n\n"
+    now = time.monotonic()
     for q in list(sse_subscribers):
+        if now - sse_last_activity.get(q, now) > SSE_IDLE_TIMEOUT_SEC:
+            _drop_sse_subscriber(q)
+            continue
+        # Each queue holds only the latest frame; a slow client skips stale ones
         try:
-            q.put_nowait(msg)
-        except Exception:
+            q.put_nowait(frame)
+        except asyncio.QueueFull:
             try:
-                sse_subscribers.remove(q)
-            except ValueError:
+                q.get_nowait()
+            except asyncio.QueueEmpty:
                 pass
+            q.put_nowait(frame)
+        except Exception:
+            _drop_sse_subscriber(q)
 
 @app.get("/api/metrics")
 async def get_metrics():
@@ -414,23 +489,31 @@ async def get_metrics():
 
 @app.get("/api/stream/best")
 async def stream_best():
-    async def event_gen(queue: asyncio.Queue[str]):
+    async def event_gen(queue: asyncio.Queue[bytes]):
         # send initial if available
         cached = await cache.get("best_signal")
         if cached:
-            yield f"data: {json.dumps(cached)}\n\n"
+            yield b"data: " + orjson.dumps(cached, default=str) + b"\n\n"
         try:
             while True:
+                # broadcast_sse drops subscribers that stalled past SSE_IDLE_TIMEOUT_SEC;
+                # end the stream then so EventSource reconnects instead of idling on keep-alives
+                if queue not in sse_last_activity:
+                    return
+                sse_last_activity[queue] = time.monotonic()
                 try:
                     msg = await asyncio.wait_for(queue.get(), timeout=10.0)
                     yield msg
                 except asyncio.TimeoutError:
-                    yield ": keep-alive\n\n"
+                    yield b": keep-alive\n\n"
         except asyncio.CancelledError:
             return
+        finally:
+            _drop_sse_subscriber(queue)
 
-    q: asyncio.Queue[str] = asyncio.Queue()
+    q: asyncio.Queue[bytes] = asyncio.Queue(maxsize=1)
     sse_subscribers.append(q)
+    sse_last_activity[q] = time.monotonic()
     return StreamingResponse(event_gen(q), media_type="text/event-stream")
 
 @app.post("/api/replay/prices")
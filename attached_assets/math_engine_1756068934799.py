@@ -4,7 +4,6 @@ import time
 from typing import Protocol, Any, Dict, List, Optional
 
 import numpy as np
-import pandas as pd
 from statsmodels.tsa.stattools import coint
 
 
@@ -19,9 +18,15 @@ class MathProvider(Protocol):
         ...
 
 
+def _as_f64(x) -> np.ndarray:
+    # No-copy for float64 ndarrays; pd.Series and lists are converted once
+    return np.ascontiguousarray(x, dtype=np.float64)
+
+
 class NumPyProvider:
     """
-    Wraps NumPy/SciPy/Pandas for common statistical and linear algebra ops.
+    Wraps NumPy/SciPy for common statistical and linear algebra ops.
+    Inputs may be ndarrays or pd.Series; they are used as float64 ndarrays.
     Operations:
       - mean(series)
       - std(series, ddof=1)
@@ -45,33 +50,32 @@ class NumPyProvider:
 
     def compute(self, operation: str, **params) -> Any:
         if operation == 'mean':
-            s: pd.Series = params['series']
-            return float(pd.Series(s).mean())
+            return float(np.mean(_as_f64(params['series'])))
         if operation == 'std':
-            s: pd.Series = params['series']
             ddof: int = params.get('ddof', 1)
-            return float(pd.Series(s).std(ddof=ddof))
+            return float(np.std(_as_f64(params['series']), ddof=ddof))
         if operation == 'corr':
-            x: pd.Series = params['x']
-            y: pd.Series = params['y']
-            return float(pd.Series(x).corr(pd.Series(y)))
+            # Pearson from centered dot products; skips corrcoef's 2x2 covariance matrix
+            dx = _as_f64(params['x'])
+            dy = _as_f64(params['y'])
+            dx = dx - dx.mean()
+            dy = dy - dy.mean()
+            return float(dx @ dy / math.sqrt(float(dx @ dx) * float(dy @ dy)))
         if operation == 'lstsq':
             X: np.ndarray = np.asarray(params['X'])
             y: np.ndarray = np.asarray(params['y'])
             coef, *_ = np.linalg.lstsq(X, y, rcond=None)
             return coef
         if operation == 'coint_pvalue':
-            x: pd.Series = params['x']
-            y: pd.Series = params['y']
-            _, pvalue, _ = coint(x, y)
+            _, pvalue, _ = coint(_as_f64(params['x']), _as_f64(params['y']))
             return float(pvalue)
         if operation == 'half_life':
-            spread: pd.Series = pd.Series(params['spread'])
-            spread_lag = spread.shift(1).dropna()
-            spread_diff = spread.diff().dropna()
-            X = spread_lag.values.reshape(-1, 1)
-            y = spread_diff.values
-            alpha = -np.linalg.lstsq(X, y, rcond=None)[0][0]
+            spread = _as_f64(params['spread'])
+            spread_lag = spread[:-1]
+            spread_diff = np.diff(spread)
+            # No-intercept AR(1) slope in closed form
+            denom = float(spread_lag @ spread_lag)
+            alpha = -float(spread_lag @ spread_diff) / denom if denom else 0.0
             if alpha > 0:
                 hl = -np.log(2) / np.log(1 - alpha)
                 return float(min(hl, 30.0))
@@ -109,21 +113,30 @@ class MathEngine:
 
     def __init__(self):
         self._providers: List[MathProvider] = []
+        # operation -> first provider supporting it; rebuilt lazily after registration
+        self._resolved: Dict[str, MathProvider] = {}
 
     def register_provider(self, provider: MathProvider, prepend: bool = False):
         if prepend:
             self._providers.insert(0, provider)
         else:
             self._providers.append(provider)
+        self._resolved.clear()
 
     def providers(self) -> List[MathProvider]:
         return list(self._providers)
 
+    def _provider_for(self, operation: str) -> MathProvider:
+        p = self._resolved.get(operation)
+        if p is None:
+            p = next((p for p in self._providers if p.supports(operation)), None)
+            if p is None:
+                raise ValueError(f"No provider supports operation '{operation}'")
+            self._resolved[operation] = p
+        return p
+
     def compute(self, operation: str, **params):
-        for p in self._providers:
-            if p.supports(operation):
-                return p.compute(operation, **params)
-        raise ValueError(f"No provider supports operation '{operation}'")
+        return self._provider_for(operation).compute(operation, **params)
 
     def compute_with_timing(self, operation: str, **params):
         start = time.perf_counter()
@@ -1,34 +1,39 @@
 from __future__ import annotations
 import os
 import pandas as pd
-from typing import Protocol
+from typing import Protocol, Optional
 import numpy as np
-from backend.core.math_engine import get_default_engine
+from backend.core._coint_numba import DEFAULT_MAXLAG, eg_coint_pvalue, log_hedge_ratio, ols_slope, spread_half_life
 
 class QuantProvider(Protocol):
-    def calculate_hedge_ratio(self, p1: pd.Series, p2: pd.Series) -> float: ...
+    def calculate_hedge_ratio(self, p1: pd.Series, p2: pd.Series,
+                              lp1: Optional[np.ndarray] = None, lp2: Optional[np.ndarray] = None) -> float: ...
     def test_cointegration(self, p1: pd.Series, p2: pd.Series) -> float: ...
     def calculate_half_life(self, spread: pd.Series) -> float: ...
     def calculate_expected_edge(self, z: float, sstd: float, p2: float, half_life: float, sym1: str, sym2: str) -> float: ...
     def calculate_confidence(self, pval: float, half_life: float, sstd: float, n: int) -> float: ...
 
 class LocalQuant:
-    """Local NumPy/Statsmodels implementation. Default provider."""
-    def __init__(self):
-        self.engine = get_default_engine()
-    def calculate_hedge_ratio(self, p1: pd.Series, p2: pd.Series) -> float:
-        lp1 = np.log(p1)
-        lp2 = np.log(p2)
-        A = np.vstack([lp1, np.ones(len(lp1))]).T
-        coef = self.engine.compute('lstsq', X=A, y=lp2)
-        hedge = coef[0]
-        return float(hedge)
+    """Local NumPy/Numba implementation. Default provider."""
+    def calculate_hedge_ratio(self, p1: pd.Series, p2: pd.Series,
+                              lp1: Optional[np.ndarray] = None, lp2: Optional[np.ndarray] = None) -> float:
+        # Closed-form log-price OLS slope; LAPACK lstsq setup dominates at T~200.
+        # Callers holding PriceRing.tail_log() views pass lp1/lp2 to skip the logs.
+        if lp1 is not None and lp2 is not None:
+            return float(ols_slope(np.ascontiguousarray(lp1, dtype=np.float64),
+                                   np.ascontiguousarray(lp2, dtype=np.float64)))
+        x = np.ascontiguousarray(p1, dtype=np.float64)
+        y = np.ascontiguousarray(p2, dtype=np.float64)
+        return float(log_hedge_ratio(x, y))
 
     def test_cointegration(self, p1: pd.Series, p2: pd.Series) -> float:
-        return float(self.engine.compute('coint_pvalue', x=p1, y=p2))
+        # Compiled Engle-Granger with fixed ADF lags instead of statsmodels' coint()
+        x = np.ascontiguousarray(p1, dtype=np.float64)
+        y = np.ascontiguousarray(p2, dtype=np.float64)
+        return float(eg_coint_pvalue(x, y, DEFAULT_MAXLAG))
 
     def calculate_half_life(self, spread: pd.Series) -> float:
-        return float(self.engine.compute('half_life', spread=spread))
+        return float(spread_half_life(np.ascontiguousarray(spread, dtype=np.float64), 30.0))
 
     def calculate_expected_edge(self, z: float, sstd: float, p2: float, half_life: float, sym1: str, sym2: str) -> float:
         expected_spread_change = abs(z) * sstd * 0.5
@@ -1,13 +1,19 @@
+import math
+import time
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 import structlog
 
+from backend.core._coint_numba import eg_df_tstat, spread_stats
+
 logger = structlog.get_logger()
 
-@dataclass
+# (symbols, (T, N) prices, (T, N) log-prices, per-symbol sample counts) from SignalEngine.price_matrix
+PriceSnapshot = Tuple[List[str], np.ndarray, np.ndarray, List[int]]
+
+@dataclass(slots=True)
 class TradingSignal:
     pair: Tuple[str, str]
     hedge_ratio: float
@@ -24,82 +30,216 @@ class TradingSignal:
     metadata: Dict
 
 class PerformanceTracker:
+    """Running aggregates over every recorded signal; O(1) to record and to report."""
     def __init__(self):
-        self.signals_history = []
+        self._n = 0
+        self._sum_conf = 0.0
+        self._sum_edge = 0.0
 
     def record_signal(self, signal: TradingSignal):
-        self.signals_history.append({
-            'timestamp': signal.timestamp,
-            'pair': signal.pair,
-            'z_score': signal.z_score,
-            'expected_edge': signal.expected_edge_bps,
-            'confidence': signal.confidence,
-        })
+        self._sum_conf += signal.confidence
+        self._sum_edge += signal.expected_edge_bps
+        self._n += 1
 
     def calculate_metrics(self) -> Dict:
-        if not self.signals_history:
+        n = self._n
+        if not n:
             return {'total_signals': 0, 'avg_confidence': 0.0, 'avg_expected_edge': 0.0}
         return {
-            'total_signals': len(self.signals_history),
-            'avg_confidence': float(np.mean([s['confidence'] for s in self.signals_history])),
-            'avg_expected_edge': float(np.mean([s['expected_edge'] for s in self.signals_history])),
+            'total_signals': n,
+            'avg_confidence': float(self._sum_conf / n),
+            'avg_expected_edge': float(self._sum_edge / n),
         }
 
+class PriceRing:
+    """Fixed-capacity struct-of-arrays ring of per-tick samples for one symbol:
+    price, log-price, volume and funding (float64) plus epoch-ms timestamps (int64).
+
+    Every sample is written twice, at slot i and i + capacity, so the most
+    recent n samples of any column are one contiguous slice: tail() and friends
+    are O(1) views, with no concatenate on wrap. `count` is the total number of
+    samples ever appended, so it keeps advancing after the ring is full.
+    """
+    __slots__ = ('capacity', 'count', '_prices', '_logp', '_volume', '_funding', '_ts_ms', '_head', '_size')
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._prices = np.empty(2 * self.capacity, dtype=np.float64)
+        self._logp = np.empty(2 * self.capacity, dtype=np.float64)
+        self._volume = np.empty(2 * self.capacity, dtype=np.float64)
+        self._funding = np.empty(2 * self.capacity, dtype=np.float64)
+        self._ts_ms = np.empty(2 * self.capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, price: float, ts_ms: int, volume: float = 0.0, funding: float = 0.0):
+        i = self._head
+        j = i + self.capacity
+        self._prices[j] = self._prices[i] = price
+        self._logp[j] = self._logp[i] = math.log(price) if price > 0.0 else math.nan
+        self._volume[j] = self._volume[i] = volume
+        self._funding[j] = self._funding[i] = funding
+        self._ts_ms[j] = self._ts_ms[i] = ts_ms
+        self._head = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+        self.count += 1
+
+    def _window(self, n: Optional[int]) -> slice:
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def tail(self, n: Optional[int] = None) -> np.ndarray:
+        """View of the last n prices (all retained if n is None), oldest first."""
+        return self._prices[self._window(n)]
+
+    def tail_log(self, n: Optional[int] = None) -> np.ndarray:
+        """View of log(price) aligned with tail(n), computed once per sample on append."""
+        return self._logp[self._window(n)]
+
+    def tail_ts(self, n: Optional[int] = None) -> np.ndarray:
+        """View of the epoch-ms timestamps aligned with tail(n)."""
+        return self._ts_ms[self._window(n)]
+
+    def tail_volume(self, n: Optional[int] = None) -> np.ndarray:
+        return self._volume[self._window(n)]
+
+    def tail_funding(self, n: Optional[int] = None) -> np.ndarray:
+        return self._funding[self._window(n)]
+
+
+def _row_ts_ms(data: Dict) -> int:
+    ts_ms = data.get('_ts_ms')
+    if ts_ms is not None:
+        return int(ts_ms)
+    ts = data['timestamp']
+    tdt = datetime.fromisoformat(ts) if isinstance(ts, str) else ts
+    if tdt.tzinfo is None:
+        tdt = tdt.replace(tzinfo=timezone.utc)
+    return int(tdt.timestamp() * 1000)
+
+
 class SignalEngine:
     def __init__(self, config, quant_provider=None):
         from backend.core.quant import LocalQuant  # local import to avoid cycles
         self.config = config
         self.quant = quant_provider or LocalQuant()
-        self.price_history: Dict[str, List[Dict]] = {}
+        self.price_history: Dict[str, PriceRing] = {}
         self.signals_cache: Dict[str, TradingSignal] = {}
+        # (sym1, sym2) -> (sym1 count, sym2 count, correlation, p-value, monotonic time)
+        # at the last cointegration test
+        self._pair_pval: Dict[Tuple[str, str], Tuple[int, int, float, float, float]] = {}
+        # Scratch for per-pair spreads, reused across _analyze_pair calls.
+        # Pair scans run one at a time (single-worker compute pool in main).
+        self._spread_buf = np.empty(getattr(config, 'lookback_period', 200), dtype=np.float64)
         self.performance_tracker = PerformanceTracker()
 
     def update_prices(self, price_data: List[Dict]):
         for data in price_data:
-            symbol = data['symbol']
-            self.price_history.setdefault(symbol, [])
-            self.price_history[symbol].append({
-                'timestamp': data['timestamp'],
-                'price': float(data['price']),
-                'volume': float(data.get('volume', 0) or 0),
-                'funding': float(data.get('funding_rate', 0) or 0),
-            })
-            if len(self.price_history[symbol]) > getattr(self.config, 'lookback_period', 200):
-                self.price_history[symbol].pop(0)
-
-    def find_cointegrated_pairs(self) -> List[TradingSignal]:
+            self._ring(data['symbol']).append(
+                float(data['price']),
+                _row_ts_ms(data),
+                float(data.get('volume', 0) or 0),
+                float(data.get('funding_rate', 0) or 0),
+            )
+
+    def _ring(self, symbol: str) -> PriceRing:
+        ring = self.price_history.get(symbol)
+        if ring is None:
+            ring = self.price_history[symbol] = PriceRing(getattr(self.config, 'lookback_period', 200))
+        return ring
+
+    def find_cointegrated_pairs(self, snapshot: Optional[PriceSnapshot] = None) -> List[TradingSignal]:
+        """Scan pairs of a price_matrix() snapshot, taking one when none is given.
+        Callers running this off the event loop take the snapshot on the loop and pass it in."""
         signals: List[TradingSignal] = []
-        symbols = list(self.price_history.keys())
-        for i, sym1 in enumerate(symbols):
-            for sym2 in symbols[i+1:]:
-                signal = self._analyze_pair(sym1, sym2)
-                if signal and signal.confidence > get_attr(self.config, 'min_confidence', 0.5):
-                    signals.append(signal)
+        symbols, P, L, counts = snapshot if snapshot is not None else self.price_matrix()
+        if len(symbols) < 2:
+            return signals
+        # All pairwise correlations and log-price hedge ratios in a couple of BLAS calls
+        with np.errstate(divide='ignore', invalid='ignore'):
+            C = np.corrcoef(P, rowvar=False)
+            Lc = L - L.mean(axis=0)
+            S = Lc.T @ Lc
+            # OLS slope of log(p_j) on log(p_i): cov(i, j) / var(i)
+            H = S / np.diag(S)[:, None]
+        min_corr = get_attr(self.config, 'min_abs_correlation', 0.3)
+        for i, j in np.argwhere(np.triu(np.abs(C) >= min_corr, k=1)).tolist():
+            signal = self._analyze_pair(symbols[i], symbols[j], P[:, i], P[:, j], float(C[i, j]), float(H[i, j]),
+                                        (counts[i], counts[j]))
+            if signal and signal.confidence > get_attr(self.config, 'min_confidence', 0.5):
+                signals.append(signal)
         signals.sort(key=lambda x: x.expected_edge_bps, reverse=True)
         return signals[: get_attr(self.config, 'max_pairs_to_track', 10)]
 
-    def _analyze_pair(self, sym1: str, sym2: str) -> Optional[TradingSignal]:
+    def price_matrix(self) -> PriceSnapshot:
+        """Snapshot histories with at least min_samples points as (T, N) float64 price and
+        log-price matrices, plus each ring's sample count at snapshot time.
+        Columns are trimmed to the shortest history so rows line up in time. Call it on
+        the thread that runs update_prices; the copies can then go to a worker."""
+        min_samples = get_attr(self.config, 'min_samples', 30)
+        rings = [(s, r) for s, r in list(self.price_history.items()) if len(r) >= min_samples]
+        if not rings:
+            empty = np.empty((0, 0), dtype=np.float64)
+            return [], empty, empty, []
+        counts = [r.count for _, r in rings]
+        n = min(len(r) for _, r in rings)
+        # Column-major, so each symbol's series handed to the pair kernels is contiguous
+        P = np.empty((n, len(rings)), dtype=np.float64, order='F')
+        L = np.empty((n, len(rings)), dtype=np.float64, order='F')
+        for k, (_, r) in enumerate(rings):
+            P[:, k] = r.tail(n)
+            L[:, k] = r.tail_log(n)
+        return [s for s, _ in rings], P, L, counts
+
+    def _coint_pvalue(self, sym1: str, sym2: str, p1: np.ndarray, p2: np.ndarray,
+                      counts: Tuple[int, int], corr: float) -> float:
+        """Cointegration p-value for the pair -- it barely moves from one tick to the next.
+        The cached value is reused only while it is younger than pval_ttl_sec, neither
+        leg has taken pval_refresh_ticks new samples, and the pair correlation is within
+        pval_corr_tolerance of what it was at the last test."""
+        now = time.monotonic()
+        cached = self._pair_pval.get((sym1, sym2))
+        if cached is not None:
+            refresh = get_attr(self.config, 'pval_refresh_ticks', 3)
+            if (now - cached[4] < get_attr(self.config, 'pval_ttl_sec', 60.0)
+                    and counts[0] - cached[0] < refresh and counts[1] - cached[1] < refresh
+                    and abs(corr - cached[2]) < get_attr(self.config, 'pval_corr_tolerance', 0.01)):
+                return cached[3]
+        pval = float(self.quant.test_cointegration(p1, p2))
+        self._pair_pval[(sym1, sym2)] = (counts[0], counts[1], corr, pval, now)
+        return pval
+
+    def _analyze_pair(self, sym1: str, sym2: str, p1: np.ndarray, p2: np.ndarray,
+                      corr: float, hedge: float, counts: Tuple[int, int]) -> Optional[TradingSignal]:
         try:
-            p1 = pd.Series([p['price'] for p in self.price_history.get(sym1, [])])
-            p2 = pd.Series([p['price'] for p in self.price_history.get(sym2, [])])
-            min_samples = get_attr(self.config, 'min_samples', 30)
-            if len(p1) < min_samples or len(p2) < min_samples:
-                return None
-            corr = float(p1.corr(p2))
-            if abs(corr) < get_attr(self.config, 'min_abs_correlation', 0.3):
-                return None
-            hedge = self.quant.calculate_hedge_ratio(p1, p2)
-            spread = p2 - hedge * p1
-            pval = float(self.quant.test_cointegration(p1, p2))
-            if get_attr(self.config, 'enable_coint_check', True):
-                if pval > getattr(self.config, 'min_cointegration_pvalue', 0.05):
+            n = p1.shape[0]
+            if self._spread_buf.shape[0] < n:
+                self._spread_buf = np.empty(n, dtype=np.float64)
+            # spread = p2 - hedge * p1, written into scratch; everything below only reads it
+            spread = self._spread_buf[:n]
+            np.multiply(p1, hedge, out=spread)
+            np.subtract(p2, spread, out=spread)
+            spread_mean, spread_std, _, z = spread_stats(spread)
+            coint_gate = get_attr(self.config, 'enable_coint_check', True)
+            if coint_gate:
+                # Cheap screen on the Engle-Granger residuals without lags or a solve;
+                # spreads that do not revert at all are dropped before the full ADF fit
+                if not eg_df_tstat(p1, p2) < get_attr(self.config, 'coint_prefilter_tstat', 0.0):
+                    return None
+            pval = self._coint_pvalue(sym1, sym2, p1, p2, counts, corr)
+            if coint_gate:
+                # NaN (constant or too-short input) fails the test rather than passing it
+                if not pval <= getattr(self.config, 'min_cointegration_pvalue', 0.05):
                     return None
             half_life = float(self.quant.calculate_half_life(spread))
-            spread_mean = float(spread.mean())
-            spread_std = float(spread.std() or 1e-9)
-            z = float((spread.iloc[-1] - spread_mean) / spread_std)
             signal_type = self._determine_signal(z)
-            edge = float(self.quant.calculate_expected_edge(z, spread_std, float(p2.iloc[-1]), half_life, sym1, sym2))
+            edge = float(self.quant.calculate_expected_edge(z, spread_std, float(p2[-1]), half_life, sym1, sym2))
             conf = float(self.quant.calculate_confidence(pval, half_life, spread_std, len(p1)))
             ts = datetime.now()
             sig = TradingSignal(
@@ -115,7 +255,7 @@ class SignalEngine:
                 expected_edge_bps=edge,
                 confidence=conf,
                 timestamp=ts,
-                metadata={'spread_history': spread.tail(30).tolist(), 'prices': {sym1: float(p1.iloc[-1]), sym2: float(p2.iloc[-1])}},
+                metadata={'spread_history': spread[-30:].tolist(), 'prices': {sym1: float(p1[-1]), sym2: float(p2[-1])}},
             )
             self.performance_tracker.record_signal(sig)
             return sig
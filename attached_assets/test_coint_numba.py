@@ -0,0 +1,150 @@
+import warnings
+
+import numpy as np
+import pytest
+
+coint = pytest.importorskip("backend.core._coint_numba")
+
+T = 200
+MAXLAG = coint.DEFAULT_MAXLAG
+
+
+def _random_walk(rng, start=100.0):
+    return np.cumsum(rng.standard_normal(T)) + start
+
+
+def _cointegrated_pair(seed):
+    rng = np.random.default_rng(seed)
+    x = _random_walk(rng)
+    u = np.zeros(T)
+    for t in range(1, T):
+        u[t] = 0.6 * u[t - 1] + rng.standard_normal()
+    return 1.5 * x + 10.0 + u, x
+
+
+def _ar2_cointegrated_pair(seed, a1, a2):
+    rng = np.random.default_rng(seed)
+    x = _random_walk(rng)
+    u = np.zeros(T)
+    for t in range(2, T):
+        u[t] = a1 * u[t - 1] + a2 * u[t - 2] + rng.standard_normal()
+    return 1.5 * x + 10.0 + u, x
+
+
+def _independent_pair(seed):
+    rng = np.random.default_rng(seed)
+    return _random_walk(rng, 50.0), _random_walk(rng)
+
+
+def _statsmodels(y0, y1):
+    stattools = pytest.importorskip("statsmodels.tsa.stattools")
+    tstat, pvalue, _ = stattools.coint(y0, y1, maxlag=MAXLAG, autolag=None)
+    return tstat, pvalue
+
+
+def _lstsq_df_tstat(y0, y1):
+    # Stage-1 OLS with a constant, then Dickey-Fuller with no constant and no lags
+    X = np.column_stack([np.ones_like(y1), y1])
+    resid = y0 - X @ np.linalg.lstsq(X, y0, rcond=None)[0]
+    lag, diff = resid[:-1], np.diff(resid)
+    g = lag @ diff / (lag @ lag)
+    s2 = np.sum((diff - g * lag) ** 2) / (len(diff) - 1)
+    return g / np.sqrt(s2 / (lag @ lag))
+
+
+@pytest.mark.parametrize("make_pair", [_cointegrated_pair, _independent_pair])
+@pytest.mark.parametrize("seed", [0, 1, 2, 3, 4])
+def test_matches_statsmodels_coint(make_pair, seed):
+    y0, y1 = make_pair(seed)
+    tstat, pvalue = _statsmodels(y0, y1)
+    assert coint.eg_adf_tstat(y0, y1, MAXLAG) == pytest.approx(tstat, rel=1e-10, abs=1e-10)
+    assert coint.eg_coint_pvalue(y0, y1, MAXLAG) == pytest.approx(pvalue, rel=1e-10, abs=1e-12)
+
+
+def test_cointegrated_pairs_are_significant():
+    for seed in range(5):
+        assert coint.eg_coint_pvalue(*_cointegrated_pair(seed), MAXLAG) < 0.05
+
+
+@pytest.mark.parametrize("make_pair", [_cointegrated_pair, _independent_pair])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_df_tstat_matches_lstsq(make_pair, seed):
+    y0, y1 = make_pair(seed)
+    assert coint.eg_df_tstat(y0, y1) == pytest.approx(_lstsq_df_tstat(y0, y1), rel=1e-9)
+
+
+@pytest.mark.parametrize("a1, a2", [(1.5, -0.6), (1.7, -0.75), (1.8, -0.85)])
+def test_df_prefilter_keeps_pairs_with_ar2_residuals(a1, a2):
+    # The signal engine rejects pairs whose lag-free DF t-stat is >= 0 before the full test
+    passed = 0
+    for seed in range(50):
+        y0, y1 = _ar2_cointegrated_pair(seed, a1, a2)
+        if coint.eg_coint_pvalue(y0, y1, MAXLAG) < 0.05:
+            passed += 1
+            assert coint.eg_df_tstat(y0, y1) < 0.0
+    assert passed > 0
+
+
+def test_constant_regressor_is_nan():
+    y0 = _random_walk(np.random.default_rng(7))
+    y1 = np.full(T, 5.0)
+    assert np.isnan(coint.eg_adf_tstat(y0, y1, MAXLAG))
+    assert np.isnan(coint.eg_coint_pvalue(y0, y1, MAXLAG))
+    assert np.isnan(coint.eg_df_tstat(y0, y1))
+
+
+def test_collinear_series_match_statsmodels():
+    y1 = _random_walk(np.random.default_rng(8))
+    y0 = 2.0 * y1 + 3.0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        tstat, pvalue = _statsmodels(y0, y1)
+    assert tstat == -np.inf and pvalue == 0.0
+    assert coint.eg_adf_tstat(y0, y1, MAXLAG) == -np.inf
+    assert coint.eg_coint_pvalue(y0, y1, MAXLAG) == 0.0
+
+
+def test_too_short_is_nan():
+    y1 = _random_walk(np.random.default_rng(9))[:MAXLAG + 3]
+    assert np.isnan(coint.eg_adf_tstat(y1 + 1.0, y1, MAXLAG))
+    assert np.isnan(coint.eg_df_tstat(y1[:3] + 1.0, y1[:3]))
+
+
+def test_ols_slope_matches_polyfit():
+    rng = np.random.default_rng(10)
+    # Large, tightly clustered levels are where uncentered running sums cancel
+    x = 50_000.0 + rng.standard_normal(T)
+    y = 3.0 * x - 7.0 + 0.1 * rng.standard_normal(T)
+    assert coint.ols_slope(x, y) == pytest.approx(np.polyfit(x, y, 1)[0], rel=1e-9)
+    assert coint.ols_slope(np.full(T, 2.0), y) == 0.0
+    assert coint.ols_slope(x[:1], y[:1]) == 0.0
+
+
+def test_log_hedge_ratio_is_slope_of_logs():
+    p1, p2 = _cointegrated_pair(11)
+    p1, p2 = np.abs(p1) + 1.0, np.abs(p2) + 1.0
+    assert coint.log_hedge_ratio(p1, p2) == pytest.approx(np.polyfit(np.log(p1), np.log(p2), 1)[0], rel=1e-9)
+
+
+def test_spread_half_life():
+    rng = np.random.default_rng(12)
+    s = np.zeros(T)
+    for t in range(1, T):
+        s[t] = 0.9 * s[t - 1] + rng.standard_normal()
+    lag = s[:-1]
+    alpha = -(lag @ np.diff(s)) / (lag @ lag)
+    assert coint.spread_half_life(s, 30.0) == pytest.approx(-np.log(2) / np.log(1 - alpha), rel=1e-9)
+    # No reversion, a flat spread and an overshooting fit hit the cap / zero
+    assert coint.spread_half_life(np.arange(1.0, T + 1.0), 30.0) == 30.0
+    assert coint.spread_half_life(np.zeros(T), 30.0) == 30.0
+    assert coint.spread_half_life(np.array([1.0, -1.0, 1.0, -1.0]), 30.0) == 0.0
+
+
+def test_spread_stats():
+    spread = 1e6 + np.random.default_rng(13).standard_normal(T)
+    mean, std, last, z = coint.spread_stats(spread)
+    assert mean == pytest.approx(spread.mean(), rel=1e-12)
+    assert std == pytest.approx(spread.std(ddof=1), rel=1e-9)
+    assert last == spread[-1]
+    assert z == pytest.approx((spread[-1] - spread.mean()) / spread.std(ddof=1), rel=1e-6)
+    assert coint.spread_stats(np.full(5, 3.0)) == (3.0, 1e-9, 3.0, 0.0)
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+signal_engine = pytest.importorskip("backend.core.signal_engine")
+PriceRing = signal_engine.PriceRing
+
+
+def _filled(capacity, n):
+    ring = PriceRing(capacity)
+    for k in range(n):
+        ring.append(100.0 + k, 1_000 * k, volume=float(k), funding=-float(k))
+    return ring
+
+
+@pytest.mark.parametrize("n", [0, 3, 5, 6, 12, 13])
+def test_tail_is_last_samples_oldest_first(n):
+    ring = _filled(5, n)
+    kept = list(range(max(0, n - 5), n))
+    assert len(ring) == len(kept) and ring.count == n
+    assert ring.tail().tolist() == [100.0 + k for k in kept]
+    assert ring.tail_ts().tolist() == [1_000 * k for k in kept]
+    assert ring.tail_volume().tolist() == [float(k) for k in kept]
+    assert ring.tail_funding().tolist() == [-float(k) for k in kept]
+    np.testing.assert_array_equal(ring.tail_log(), np.log(ring.tail()))
+
+
+def test_tail_n_is_a_contiguous_view_after_wrap():
+    ring = _filled(5, 12)
+    assert ring.tail(3).tolist() == [109.0, 110.0, 111.0]
+    assert ring.tail(0).size == 0
+    assert ring.tail(50).tolist() == ring.tail().tolist()
+    view = ring.tail(4)
+    assert view.flags.c_contiguous and view.base is not None
+
+
+def test_non_positive_price_has_nan_log():
+    ring = PriceRing(3)
+    ring.append(0.0, 0)
+    assert np.isnan(ring.tail_log()[0])
+
+
+def test_price_matrix_aligns_shortest_history():
+    engine = signal_engine.SignalEngine(SimpleNamespace(lookback_period=8, min_samples=3))
+    rows = [{'symbol': s, 'price': p, 'timestamp': '2024-01-01T00:00:00+00:00'}
+            for s, p in (('A', 1.0), ('B', 2.0))]
+    for k in range(10):
+        engine.update_prices([dict(r, price=r['price'] + k) for r in rows])
+    engine.update_prices([{'symbol': 'C', 'price': 5.0, '_ts_ms': 0, 'timestamp': None}])
+    symbols, P, L, counts = engine.price_matrix()
+    assert symbols == ['A', 'B'] and counts == [10, 10]
+    assert P.shape == (8, 2) and P.flags.f_contiguous
+    np.testing.assert_array_equal(P[:, 0], 1.0 + np.arange(2, 10))
+    np.testing.assert_array_equal(L, np.log(P))
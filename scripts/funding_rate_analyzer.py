@@ -6,15 +6,12 @@ Fetches historical funding rates from multiple exchanges and analyzes optimal lo
 
 import asyncio
 import aiohttp
+import orjson
 import pandas as pd
 import numpy as np
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
 # Configuration
 COINS = ['BTC', 'ETH', 'SOL', 'BNB', 'XRP', 'DOGE', 'ADA', 'HYPE', 'TRX', 'LINK']
@@ -45,119 +42,128 @@ EXCHANGES = {
     }
 }
 
+EXCHANGE_KEYS = tuple(EXCHANGES)
+
+# Concurrent requests allowed per exchange; keeps the 10-coin burst under public rate limits
+PER_EXCHANGE_CONCURRENCY = 6
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+def _funding_arrays(items: List[Dict], ts_key: str, rate_key: str) -> Dict[str, np.ndarray]:
+    """Pull timestamps (int64 ms) and funding rates (float64, in percent) straight into arrays"""
+    n = len(items)
+    ts = np.fromiter((int(item[ts_key]) for item in items), dtype=np.int64, count=n)
+    rate = np.fromiter((float(item[rate_key]) for item in items), dtype=np.float64, count=n)
+    rate *= 100.0  # Convert to percentage
+    return {'ts': ts, 'rate': rate}
+
+def _empty_funding() -> Dict[str, np.ndarray]:
+    return {'ts': np.empty(0, dtype=np.int64), 'rate': np.empty(0, dtype=np.float64)}
+
 class FundingRateAnalyzer:
     def __init__(self):
         self.session = None
         self.data = {}
         self.analysis_results = {}
+        # (coin, exchange) median funding in percent; NaN where an exchange has no data
+        self.median_matrix = np.full((len(COINS), len(EXCHANGE_KEYS)), np.nan)
+        self._sem = {}
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(limit=64, limit_per_host=8, ttl_dns_cache=300,
+                                         enable_cleanup_closed=True)
+        self.session = aiohttp.ClientSession(connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=10))
+        self._sem = {ex: asyncio.Semaphore(PER_EXCHANGE_CONCURRENCY) for ex in EXCHANGES}
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
-    async def fetch_binance_funding(self, coin: str) -> List[Dict]:
+    async def fetch_binance_funding(self, coin: str) -> Dict[str, np.ndarray]:
         """Fetch funding rate data from Binance"""
         try:
             url = EXCHANGES['binance']['url']
             params = EXCHANGES['binance']['params'](coin)
             
-            async with self.session.get(url, params=params) as response:
+            async with self._sem['binance'], self.session.get(url, params=params, timeout=REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     # Binance returns funding rate as decimal (e.g., 0.0001 = 0.01%)
-                    return [{
-                        'timestamp': item['fundingTime'],
-                        'funding_rate': float(item['fundingRate']) * 100,  # Convert to percentage
-                        'exchange': 'binance'
-                    } for item in data]
+                    return _funding_arrays(data, 'fundingTime', 'fundingRate')
                 else:
                     print(f"Binance API error for {coin}: {response.status}")
-                    return []
+                    return _empty_funding()
         except Exception as e:
             print(f"Error fetching Binance data for {coin}: {e}")
-            return []
+            return _empty_funding()
     
-    async def fetch_bybit_funding(self, coin: str) -> List[Dict]:
+    async def fetch_bybit_funding(self, coin: str) -> Dict[str, np.ndarray]:
         """Fetch funding rate data from Bybit"""
         try:
             url = EXCHANGES['bybit']['url']
             params = EXCHANGES['bybit']['params'](coin)
             
-            async with self.session.get(url, params=params) as response:
+            async with self._sem['bybit'], self.session.get(url, params=params, timeout=REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if data.get('retCode') == 0 and 'result' in data:
                         # Bybit returns funding rate as percentage string
-                        return [{
-                            'timestamp': int(item['fundingRateTimestamp']),
-                            'funding_rate': float(item['fundingRate']) * 100,  # Convert to percentage
-                            'exchange': 'bybit'
-                        } for item in data['result']['list']]
+                        return _funding_arrays(data['result']['list'], 'fundingRateTimestamp', 'fundingRate')
                     else:
                         print(f"Bybit API error for {coin}: {data}")
-                        return []
+                        return _empty_funding()
                 else:
                     print(f"Bybit API error for {coin}: {response.status}")
-                    return []
+                    return _empty_funding()
         except Exception as e:
             print(f"Error fetching Bybit data for {coin}: {e}")
-            return []
+            return _empty_funding()
     
-    async def fetch_okx_funding(self, coin: str) -> List[Dict]:
+    async def fetch_okx_funding(self, coin: str) -> Dict[str, np.ndarray]:
         """Fetch funding rate data from OKX"""
         try:
             url = EXCHANGES['okx']['url']
             params = EXCHANGES['okx']['params'](coin)
             
-            async with self.session.get(url, params=params) as response:
+            async with self._sem['okx'], self.session.get(url, params=params, timeout=REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if data.get('code') == '0' and 'data' in data:
                         # OKX returns funding rate as decimal
-                        return [{
-                            'timestamp': int(item['fundingTime']),
-                            'funding_rate': float(item['realizedRate']) * 100,  # Convert to percentage
-                            'exchange': 'okx'
-                        } for item in data['data']]
+                        return _funding_arrays(data['data'], 'fundingTime', 'realizedRate')
                     else:
                         print(f"OKX API error for {coin}: {data}")
-                        return []
+                        return _empty_funding()
                 else:
                     print(f"OKX API error for {coin}: {response.status}")
-                    return []
+                    return _empty_funding()
         except Exception as e:
             print(f"Error fetching OKX data for {coin}: {e}")
-            return []
+            return _empty_funding()
     
-    async def fetch_hyperliquid_funding(self, coin: str) -> List[Dict]:
+    async def fetch_hyperliquid_funding(self, coin: str) -> Dict[str, np.ndarray]:
         """Fetch funding rate data from Hyperliquid"""
         try:
             url = EXCHANGES['hyperliquid']['url']
             params = EXCHANGES['hyperliquid']['params'](coin)
             
-            async with self.session.post(url, json=params) as response:
+            async with self._sem['hyperliquid'], self.session.post(url, json=params, timeout=REQUEST_TIMEOUT) as response:
                 if response.status == 200:
-                    data = await response.json()
+                    data = orjson.loads(await response.read())
                     if isinstance(data, list):
                         # Hyperliquid returns funding rate history as array
-                        return [{
-                            'timestamp': int(item.get('time', 0)),
-                            'funding_rate': float(item.get('fundingRate', 0)) * 100,  # Convert to percentage
-                            'exchange': 'hyperliquid'
-                        } for item in data if 'fundingRate' in item]
+                        items = [item for item in data if 'fundingRate' in item and 'time' in item]
+                        return _funding_arrays(items, 'time', 'fundingRate')
                     else:
                         print(f"Hyperliquid API error for {coin}: unexpected format")
-                        return []
+                        return _empty_funding()
                 else:
                     print(f"Hyperliquid API error for {coin}: {response.status}")
-                    return []
+                    return _empty_funding()
         except Exception as e:
             print(f"Error fetching Hyperliquid data for {coin}: {e}")
-            return []
+            return _empty_funding()
 
     async def fetch_all_funding_data(self) -> Dict:
         """Fetch funding rate data for all coins from all exchanges"""
@@ -180,13 +186,13 @@ class FundingRateAnalyzer:
         
         for coin in COINS:
             data[coin] = {}
-            for exchange in ['binance', 'bybit', 'okx', 'hyperliquid']:
+            for exchange in EXCHANGE_KEYS:
                 result = results[result_index]
-                if isinstance(result, list):
+                if isinstance(result, dict):
                     data[coin][exchange] = result
                 else:
                     print(f"Error for {coin} on {exchange}: {result}")
-                    data[coin][exchange] = []
+                    data[coin][exchange] = _empty_funding()
                 result_index += 1
         
         self.data = data
@@ -194,54 +200,62 @@ class FundingRateAnalyzer:
     
     def analyze_funding_rates(self) -> Dict:
         """Analyze funding rates to find best long/short exchanges for each coin"""
-        analysis = {}
+        n_coins, n_ex = len(COINS), len(EXCHANGE_KEYS)
+        M = np.full((n_coins, n_ex), np.nan)  # median funding
+        recent = np.full((n_coins, n_ex), np.nan)
+        counts = np.zeros((n_coins, n_ex), dtype=np.int64)
         
-        for coin in COINS:
+        for i, coin in enumerate(COINS):
+            coin_data = self.data.get(coin, {})
+            for j, exchange in enumerate(EXCHANGE_KEYS):
+                if exchange in coin_data:
+                    rates = coin_data[exchange]['rate']
+                    if rates.size:
+                        M[i, j] = np.median(rates)
+                        recent[i, j] = rates[-1]
+                        counts[i, j] = rates.size
+        self.median_matrix = M
+        
+        # Best long = lowest (most negative) median funding, best short = highest;
+        # missing cells can never win, and rows without any data are skipped below
+        has_data = ~np.isnan(M)
+        any_data = has_data.any(axis=1)
+        best_long_idx = np.where(has_data, M, np.inf).argmin(axis=1)
+        best_short_idx = np.where(has_data, M, -np.inf).argmax(axis=1)
+        
+        analysis = {}
+        for i, coin in enumerate(COINS):
             coin_analysis = {
                 'coin': coin,
-                'exchanges': {},
+                'exchanges': {
+                    EXCHANGE_KEYS[j]: {
+                        'median_funding': float(M[i, j]),
+                        'data_points': int(counts[i, j]),
+                        'recent_rate': float(recent[i, j]),
+                        'recommendation': self._get_recommendation(float(M[i, j]))
+                    } for j in np.flatnonzero(has_data[i]).tolist()
+                },
                 'best_long': None,
                 'best_short': None,
                 'summary': ''
             }
             
-            exchange_medians = {}
-            
-            # Calculate median funding rate for each exchange
-            for exchange in ['binance', 'bybit', 'okx', 'hyperliquid']:
-                if coin in self.data and exchange in self.data[coin]:
-                    rates = [item['funding_rate'] for item in self.data[coin][exchange]]
-                    if rates:
-                        median_rate = np.median(rates)
-                        count = len(rates)
-                        recent_rate = rates[-1] if rates else 0
-                        
-                        exchange_medians[exchange] = median_rate
-                        
-                        coin_analysis['exchanges'][exchange] = {
-                            'median_funding': median_rate,
-                            'data_points': count,
-                            'recent_rate': recent_rate,
-                            'recommendation': self._get_recommendation(median_rate)
-                        }
-            
-            # Find best exchanges for long and short
-            if exchange_medians:
-                # Best long = lowest (most negative) median funding
-                best_long_exchange = min(exchange_medians.items(), key=lambda x: x[1])
-                # Best short = highest (most positive) median funding  
-                best_short_exchange = max(exchange_medians.items(), key=lambda x: x[1])
+            if any_data[i]:
+                long_ex = EXCHANGE_KEYS[best_long_idx[i]]
+                long_rate = float(M[i, best_long_idx[i]])
+                short_ex = EXCHANGE_KEYS[best_short_idx[i]]
+                short_rate = float(M[i, best_short_idx[i]])
                 
                 coin_analysis['best_long'] = {
-                    'exchange': best_long_exchange[0].title(),
-                    'median_funding': best_long_exchange[1],
-                    'reason': self._get_long_reason(best_long_exchange[1])
+                    'exchange': long_ex.title(),
+                    'median_funding': long_rate,
+                    'reason': self._get_long_reason(long_rate)
                 }
                 
                 coin_analysis['best_short'] = {
-                    'exchange': best_short_exchange[0].title(),
-                    'median_funding': best_short_exchange[1],
-                    'reason': self._get_short_reason(best_short_exchange[1])
+                    'exchange': short_ex.title(),
+                    'median_funding': short_rate,
+                    'reason': self._get_short_reason(short_rate)
                 }
                 
                 coin_analysis['summary'] = self._generate_summary(coin, coin_analysis)
@@ -298,6 +312,9 @@ class FundingRateAnalyzer:
     
     def create_visualization(self, output_path: str = 'funding_rate_analysis.html'):
         """Create interactive visualization using Plotly"""
+        # Imported here so fetching/analysis doesn't pay plotly's import time and memory
+        import plotly.graph_objects as go
+
         fig = go.Figure()
         
         y_positions = list(range(len(COINS)))
@@ -397,5 +414,10 @@ async def main():
         return analysis
 
 if __name__ == "__main__":
-    # Run the analyzer
-    analysis_results = asyncio.run(main())
\ No newline at end of file
+    # Run the analyzer on uvloop's libuv event loop when it is installed (not on Windows)
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    analysis_results = run(main())
\ No newline at end of file